@@ -5,8 +5,12 @@ import difflib
 import sys
 import os
 import requests # type: ignore
+import bundle
 import data
+import offsets
 import remove
+import sprites
+import store
 from PIL import Image, ImageTk # type: ignore
 from io import BytesIO
 
@@ -22,7 +26,7 @@ def resource_path(relative_path):
 # Define the initialize_csv function
 def initialize_csv(csv_file):
     """Initialize the CSV file with headers if it doesn't exist."""
-    if not os.path.exists(csv_file):
+    if not bundle.dataset_exists(csv_file):
         with open(csv_file, mode='w', newline='', encoding='utf-8') as file:
             writer = csv.writer(file)
             if csv_file == "Pokemon.csv":
@@ -61,7 +65,12 @@ class PokemonGUI:
         self.root = root
         self.root.title("Pokémon Data Application")
         self.csv_file = None
-        self.center_window(self.root, 400, 300)  # Center the main window with desired dimensions
+        # Decoded sprites, and the optional thumbnail atlas used by result lists
+        self.sprite_cache = sprites.SpriteCache()
+        self.atlas = sprites.SpriteAtlas.load(resource_path(sprites.atlas_file),
+                                              resource_path(sprites.atlas_offsets_file))
+        self.atlas_photo = None
+        self.center_window(self.root, 400, 380)  # Center the main window with desired dimensions
         self.initialize_gui()
 
     def center_window(self, window, width, height):
@@ -85,6 +94,8 @@ class PokemonGUI:
         tk.Button(self.menu_frame, text="Select Database", command=self.select_database).pack(pady=5)
         tk.Button(self.menu_frame, text="Add New Pokémon Entry", command=self.add_entry).pack(pady=5)
         tk.Button(self.menu_frame, text="Retrieve Entry", command=self.retrieve_entry).pack(pady=5)
+        tk.Button(self.menu_frame, text="Edit Entry", command=self.edit_entry).pack(pady=5)
+        tk.Button(self.menu_frame, text="Delete Entry", command=self.delete_entry).pack(pady=5)
         tk.Button(self.menu_frame, text="Exit", command=self.root.quit).pack(pady=5)
 
     def select_database(self):
@@ -97,8 +108,10 @@ class PokemonGUI:
             messagebox.showerror("Invalid Choice", "Please enter 1 or 2.")
             return
 
-        # Initialize the CSV file
+        # Initialize the CSV file and start following changes made by other sessions
         initialize_csv(self.csv_file)
+        store.get_store(self.csv_file).start_watcher()
+        offsets.get_index(self.csv_file).resume_compaction()
         messagebox.showinfo("Database Selected", f"Database set to {self.csv_file}")
 
     def add_entry(self):
@@ -106,6 +119,7 @@ class PokemonGUI:
             messagebox.showwarning("No Database Selected", "Please select a database first.")
             return
 
+        bundle.materialize(self.csv_file)
         with open(self.csv_file, mode='a', newline='', encoding='utf-8') as file:
             writer = csv.writer(file)
 
@@ -124,13 +138,78 @@ class PokemonGUI:
             writer.writerow(new_entry)
             messagebox.showinfo("Success", "Entry added successfully!")
 
+    def select_entry(self, index):
+        """Ask for an entry by ID, and by form if several share it. Returns (id, occurrence, row)."""
+        row_id = simpledialog.askstring("Select Entry", "Enter the ID of the entry:")
+        if row_id is None:
+            return None
+        entries = index.entries(row_id)
+        if not entries:
+            messagebox.showinfo("Not Found", f"No matching entry found for id = {row_id}.")
+            return None
+        if len(entries) == 1:
+            return (row_id,) + entries[0]
+
+        selected = simpledialog.askstring("Select Form", "Multiple forms found:\n" +
+                                          "\n".join(f"{number}. {index.describe(row)}"
+                                                    for number, (occurrence, row) in enumerate(entries, start=1)) +
+                                          "\nEnter the number of the form:")
+        if selected is None:
+            return None
+        if selected.isdigit() and 1 <= int(selected) <= len(entries):
+            return (row_id,) + entries[int(selected) - 1]
+        messagebox.showerror("Invalid Selection", "Please enter a valid number.")
+        return None
+
+    def edit_entry(self):
+        if not self.csv_file:
+            messagebox.showwarning("No Database Selected", "Please select a database first.")
+            return
+
+        index = offsets.get_index(self.csv_file)
+        selected = self.select_entry(index)
+        if selected is None:
+            return
+        row_id, occurrence, row = selected
+
+        for header in index.headers:
+            # Rows are addressed by id, so it can't be changed here
+            if header in offsets.id_columns:
+                continue
+            value = simpledialog.askstring("Edit Entry", f"Enter {header}:", initialvalue=row.get(header) or '')
+            if value is None:
+                messagebox.showinfo("Cancelled", "Entry edit cancelled.")
+                return
+            row[header] = value.strip()
+
+        # The change goes to the update log, compaction writes it into the CSV file
+        index.update(row_id, occurrence, row)
+        index.start_compaction()
+        messagebox.showinfo("Success", "Entry updated successfully!")
+
+    def delete_entry(self):
+        if not self.csv_file:
+            messagebox.showwarning("No Database Selected", "Please select a database first.")
+            return
+
+        index = offsets.get_index(self.csv_file)
+        selected = self.select_entry(index)
+        if selected is None:
+            return
+        row_id, occurrence, row = selected
+
+        if messagebox.askyesno("Delete Entry", f"Delete {index.describe(row)}?"):
+            index.delete(row_id, occurrence)
+            index.start_compaction()
+            messagebox.showinfo("Success", "Entry deleted successfully!")
+
     def retrieve_entry(self):
         if not self.csv_file:
             messagebox.showwarning("No Database Selected", "Please select a database first.")
             return
 
         # Open the CSV file
-        with open(self.csv_file, mode='r', encoding='utf-8') as file:
+        with bundle.open_dataset(self.csv_file) as file:
             reader = csv.DictReader(file)
             headers = reader.fieldnames
 
@@ -152,59 +231,51 @@ class PokemonGUI:
             criteria_options = ["id", "name", "type"]
             if form_key:
                 criteria_options.append("form")
+            if any(column in headers for column in store.text_columns):
+                criteria_options.append("text")
 
             criteria = simpledialog.askstring("Search Entry", f"Search by ({', '.join(criteria_options)}):")
             if criteria is None or criteria.lower() not in criteria_options:
                 messagebox.showerror("Invalid Input", "Invalid search criteria.")
                 return
+            criteria = criteria.lower()
 
             value = simpledialog.askstring("Search Entry", f"Enter the {criteria}:")
             if value is None:
                 return
 
             value = value.strip().lower()
-            file.seek(0)
-            reader = csv.DictReader(file)
-
-            matching_forms = []
-            names_list = []
-
-            for row in reader:
-                names_list.append(row[name_key])
-                matches = False
-
-                if criteria == "id" and row[id_key].strip().lower() == value:
-                    matches = True
-                elif criteria == "name" and row[name_key].strip().lower() == value:
-                    matches = True
-                elif criteria == "type" and (
-                    value == row[type_key1].strip().lower() or value == row.get(type_key2, '').strip().lower()
-                ):
-                    matches = True
-                elif criteria == "form" and form_key and row[form_key].strip().lower() == value:
-                    matches = True
-
-                if matches:
-                    matching_forms.append(row)
+            search_columns = {
+                "id": [id_key],
+                "name": [name_key],
+                "type": [type_key1, type_key2],
+                "form": [form_key],
+            }
+            if criteria == "text":
+                # Ranked full-text search over abilities, classification and evolution details
+                matching_forms = store.get_store(self.csv_file).search_text(value)
+            elif criteria == "id":
+                # Read straight from the row offsets, with logged edits applied
+                matching_forms = offsets.get_index(self.csv_file).read(value)
+            else:
+                matching_forms = store.get_store(self.csv_file).find_rows(search_columns[criteria], value)
 
             if matching_forms:
                 if len(matching_forms) > 1:
                     self.prompt_form_selection(matching_forms, name_key, form_key)
                 else:
                     self.display_form_data(matching_forms[0], name_key)
+            elif criteria == "text":
+                messagebox.showinfo("Not Found", f"No matching entry found for text = {value}.")
             else:
+                with bundle.open_dataset(self.csv_file) as names_file:
+                    names_list = [row[name_key] for row in csv.DictReader(names_file)]
                 closest_name = find_closest_name(value, names_list)
                 if closest_name:
                     confirm = messagebox.askyesno("No Exact Match", f"Did you mean '{closest_name}'?")
                     if confirm:
                         value = closest_name.lower()
-                        file.seek(0)
-                        reader = csv.DictReader(file)
-                        matching_forms = []
-
-                        for row in reader:
-                            if row[name_key].strip().lower() == value:
-                                matching_forms.append(row)
+                        matching_forms = store.get_store(self.csv_file).find_rows([name_key], value)
 
                         if matching_forms:
                             if len(matching_forms) > 1:
@@ -218,24 +289,41 @@ class PokemonGUI:
                 else:
                     messagebox.showinfo("Not Found", f"No matching entry found for {criteria} = {value}.")
 
-    def prompt_form_selection(self, forms, name_key, form_key):
-        options = []
-        for index, form in enumerate(forms, start=1):
+    def prompt_form_selection(self, forms, name_key, form_key, title="Select Form"):
+        """Show the matching forms in a scrollable list to pick from."""
+        list_window = tk.Toplevel()
+        list_window.title(title)
+        tk.Label(list_window, text=f"{len(forms)} forms found:").pack(pady=5)
+
+        # Scrollable frame holding one row per form
+        canvas = tk.Canvas(list_window, width=360, height=400)
+        scrollbar = tk.Scrollbar(list_window, orient='vertical', command=canvas.yview)
+        list_frame = tk.Frame(canvas)
+        list_frame.bind('<Configure>', lambda event: canvas.configure(scrollregion=canvas.bbox('all')))
+        canvas.create_window((0, 0), window=list_frame, anchor='nw')
+        canvas.configure(yscrollcommand=scrollbar.set)
+        canvas.pack(side='left', fill='both', expand=True)
+        scrollbar.pack(side='right', fill='y')
+
+        for index, form in enumerate(forms):
             form_name = form.get(form_key, 'Standard') if form_key else 'Standard'
-            options.append(f"{form[name_key]} - {form_name}")
-
-        selected = simpledialog.askstring("Select Form", f"Multiple forms found:\n" +
-                                          "\n".join(f"{i+1}. {opt}" for i, opt in enumerate(options)) +
-                                          "\nEnter the number of the form you want to view:")
-
-        if selected is None:
-            return
-        if selected.isdigit() and 1 <= int(selected) <= len(forms):
-            selected_form = forms[int(selected) - 1]
-            self.display_form_data(selected_form, name_key)
-        else:
-            messagebox.showerror("Invalid Selection", "Please enter a valid number.")
-            self.prompt_form_selection(forms, name_key, form_key)
+            if self.atlas:
+                self.atlas_thumbnail(list_frame, form[name_key]).grid(row=index, column=0, padx=5)
+            tk.Button(list_frame, text=f"{index + 1}. {form[name_key]} - {form_name}", anchor='w',
+                      command=lambda form=form: self.display_form_data(form, name_key)).grid(
+                          row=index, column=1, sticky='we', pady=1)
+
+    def atlas_thumbnail(self, parent, pokemon_name):
+        """Return a canvas showing a Pokémon's slice of the shared atlas image."""
+        # One PhotoImage for the whole atlas, every thumbnail just offsets into it
+        if self.atlas_photo is None:
+            self.atlas_photo = ImageTk.PhotoImage(self.atlas.image)
+        size = self.atlas.thumb_size
+        thumbnail = tk.Canvas(parent, width=size, height=size, highlightthickness=0)
+        offset = self.atlas.offset(pokemon_name)
+        if offset:
+            thumbnail.create_image(-offset[0], -offset[1], anchor='nw', image=self.atlas_photo)
+        return thumbnail
 
     def display_form_data(self, form, name_key):
         # Create a new window to display the Pokémon data
@@ -269,13 +357,47 @@ class PokemonGUI:
         retrieve_another_button = tk.Button(button_frame, text="Retrieve Another", command=lambda: [data_window.destroy(), self.retrieve_entry()])
         retrieve_another_button.pack(side='left', padx=5)
 
+        # Similar button
+        similar_button = tk.Button(button_frame, text="Similar", command=lambda: self.show_similar(form, name_key))
+        similar_button.pack(side='left', padx=5)
+
         # Close button
         close_button = tk.Button(button_frame, text="Close", command=data_window.destroy)
         close_button.pack(side='left', padx=5)
 
+    def show_similar(self, form, name_key):
+        """List the Pokémon whose base stats are closest to those of the given form."""
+        # Only Pokemon.csv has a Generation column to filter on
+        has_generation = "Generation" in form
+        prompt = "Filter by type or generation" if has_generation else "Filter by type"
+        filter_value = simpledialog.askstring("Similar Pokémon", f"{prompt} (leave blank for none):")
+        if filter_value is None:
+            return
+
+        filter_value = filter_value.strip()
+        pokemon_store = store.get_store(self.csv_file)
+        if filter_value.isdigit():
+            if not has_generation:
+                messagebox.showerror("Invalid Filter", "This database has no Generation column, "
+                                                       "so it can only be filtered by type.")
+                return
+            similar_forms = pokemon_store.find_similar(form, generation=filter_value)
+        else:
+            similar_forms = pokemon_store.find_similar(form, type_name=filter_value or None)
+
+        if similar_forms:
+            form_key = "Form" if "Form" in form else "Alternate Form Name" if "Alternate Form Name" in form else None
+            self.prompt_form_selection(similar_forms, name_key, form_key, title=f"Similar to {form[name_key]}")
+        else:
+            messagebox.showinfo("Not Found", f"No similar Pokémon found for {form[name_key]}.")
+
     def fetch_pokemon_sprite(self, pokemon_name):
         """Fetch and return the sprite of a Pokémon from the PokéAPI."""
-        api_name = pokemon_name.lower().replace(' ', '-').replace('.', '').replace("'", '').replace(":", '')
+        api_name = sprites.api_name(pokemon_name)
+        photo = self.sprite_cache.get(api_name)
+        if photo:
+            return photo
+
         url = f"https://pokeapi.co/api/v2/pokemon/{api_name}"
         response = requests.get(url)
 
@@ -287,6 +409,7 @@ class PokemonGUI:
                 img_data = image_response.content
                 img = Image.open(BytesIO(img_data))
                 photo = ImageTk.PhotoImage(img)
+                self.sprite_cache.put(api_name, photo)
                 return photo
             else:
                 messagebox.showinfo("No Sprite", f"No sprite found for {pokemon_name}.")
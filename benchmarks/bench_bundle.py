@@ -0,0 +1,63 @@
+"""Report bundle size, extraction time and time to first query for plain and
+compressed copies of the shipped CSV files.
+
+Extraction is what PyInstaller does to _MEIPASS at startup: copying the bundled
+file, which for the compressed variants is just the (smaller) compressed file.
+Decompressing to a plain file is only needed before a write or a seek.
+
+Run from the repository root: python benchmarks/bench_bundle.py
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+import bundle
+import scan
+import store
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return (time.perf_counter() - start) * 1000, result
+
+def bench(suffix, directory):
+    """Bundle the CSV files with suffix ('' for plain) and time using them from directory."""
+    bundled = []
+    for csv_file in bundle.csv_files:
+        source = os.path.join(root, csv_file)
+        if suffix:
+            with open(source, mode='rb') as file:
+                bundle.codecs[suffix][1](file, os.path.join(directory, csv_file + suffix))
+        else:
+            shutil.copy(source, directory)
+        bundled.append(os.path.join(directory, csv_file + suffix))
+    size = sum(os.path.getsize(path) for path in bundled)
+
+    extracted = os.path.join(directory, "extracted")
+    os.mkdir(extracted)
+    extract_ms, _ = timed(lambda: [shutil.copy(path, extracted) for path in bundled])
+
+    csv_file = os.path.join(extracted, "Pokemon Database.csv")
+    scan_ms, rows = timed(lambda: scan.find_rows(csv_file, ["Pokemon Name"], "garchomp"))
+    # The first query runs while the store is still loading in the background
+    pokemon_store = store.PokemonStore(csv_file)
+    query_ms, _ = timed(lambda: pokemon_store.find_rows(["Pokemon Name"], "garchomp"))
+    load_ms, _ = timed(pokemon_store.loaded.wait)
+    decompress_ms, _ = timed(lambda: bundle.materialize(csv_file))
+
+    label = suffix or "plain"
+    print(f"{label:<6} {size / 1024:6.1f} KB  extract {extract_ms:5.2f} ms  "
+          f"scan {scan_ms:6.2f} ms  first query {query_ms:6.2f} ms  +load {load_ms:6.2f} ms  "
+          f"decompress for writes {decompress_ms:6.2f} ms  ({len(rows)} rows)")
+
+def main():
+    for suffix in [""] + list(bundle.codecs):
+        with tempfile.TemporaryDirectory() as directory:
+            bench(suffix, directory)
+
+if __name__ == "__main__":
+    main()
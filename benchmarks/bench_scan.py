@@ -0,0 +1,61 @@
+"""Compare the byte-level prefilter in scan.py against the original DictReader loop.
+
+Run from the repository root: python benchmarks/bench_scan.py
+"""
+import csv
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import scan
+
+# (csv file, search columns, value) for a rare and a common match in each database
+queries = [
+    ("Pokemon.csv", ["Name"], "garchomp"),
+    ("Pokemon.csv", ["Type1", "Type2"], "dragon"),
+    ("Pokemon Database.csv", ["Pokemon Name"], "garchomp"),
+    ("Pokemon Database.csv", ["Primary Type", "Secondary Type"], "dragon"),
+]
+
+def original_loop(csv_file, columns, value):
+    """The loop retrieve_entry used before scan.find_rows, including the names list."""
+    with open(csv_file, mode='r', encoding='utf-8') as file:
+        matching_forms = []
+        names_list = []
+        for row in csv.DictReader(file):
+            names_list.append(row[columns[0]])
+            if any(row[column].strip().lower() == value for column in columns):
+                matching_forms.append(row)
+        return matching_forms
+
+def make_synthetic(csv_file, copies, directory):
+    """Write a file with the rows of csv_file repeated copies times."""
+    path = os.path.join(directory, f"x{copies} {csv_file}")
+    with open(csv_file, mode='rb') as source:
+        header = source.readline()
+        body = source.read()
+    with open(path, mode='wb') as target:
+        target.write(header)
+        for _ in range(copies):
+            target.write(body)
+    return path
+
+def bench(csv_file, columns, value, number):
+    assert original_loop(csv_file, columns, value) == scan.find_rows(csv_file, columns, value)
+    loop_time = timeit.timeit(lambda: original_loop(csv_file, columns, value), number=number) / number
+    scan_time = timeit.timeit(lambda: scan.find_rows(csv_file, columns, value), number=number) / number
+    name = os.path.basename(csv_file)
+    print(f"{name:<28} {value:<10} loop {loop_time * 1000:9.2f} ms   "
+          f"scan {scan_time * 1000:9.2f} ms   {loop_time / scan_time:6.1f}x")
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        for csv_file, columns, value in queries:
+            bench(csv_file, columns, value, number=20)
+        for csv_file, columns, value in queries:
+            bench(make_synthetic(csv_file, 100, directory), columns, value, number=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Measure decode time and resident memory of a 500-sprite result list, one image per
+sprite versus slicing a single thumbnail atlas.
+
+Uses synthetic 96x96 PNGs (the size of PokéAPI front sprites) so it runs offline.
+Each scenario runs in a fresh process so resident memory isn't hidden by memory
+freed earlier. Tk photo images are only created when a display is available.
+
+Run from the repository root: python benchmarks/bench_sprites.py
+"""
+import gc
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from PIL import Image, ImageTk # type: ignore
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sprites
+
+count = 500
+
+def resident_memory():
+    """Return the resident set size of this process in bytes (Linux only)."""
+    with open("/proc/self/statm") as file:
+        return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+def make_sprite(seed):
+    """Return a 96x96 sprite with some random pixels in the middle."""
+    rng = random.Random(seed)
+    image = Image.new("RGBA", (96, 96))
+    for _ in range(400):
+        image.putpixel((rng.randrange(24, 72), rng.randrange(24, 72)),
+                       (rng.randrange(256), rng.randrange(256), rng.randrange(256), 255))
+    return image
+
+def tk_root():
+    """Return a hidden Tk root, or None when there is no display."""
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        root.withdraw()
+        return root
+    except Exception:
+        return None
+
+class TkSized:
+    """Give a PIL image the width()/height() methods of a Tk photo image."""
+
+    def __init__(self, image):
+        self.image = image
+
+    def width(self):
+        return self.image.width
+
+    def height(self):
+        return self.image.height
+
+def decode_each(directory, root):
+    images = []
+    for index in range(count):
+        image = Image.open(os.path.join(directory, f"{index}.png"))
+        image.load()
+        images.append(ImageTk.PhotoImage(image) if root else image)
+    return images
+
+def load_atlas(directory, root):
+    atlas = sprites.SpriteAtlas.load(os.path.join(directory, sprites.atlas_file),
+                                     os.path.join(directory, sprites.atlas_offsets_file))
+    photo = ImageTk.PhotoImage(atlas.image) if root else None
+    return atlas, photo
+
+def fill_cache(directory, root):
+    cache = sprites.SpriteCache(budget=4 * 1024 * 1024)
+    for index in range(count):
+        image = Image.open(os.path.join(directory, f"{index}.png"))
+        image.load()
+        cache.put(index, ImageTk.PhotoImage(image) if root else TkSized(image))
+    return cache
+
+scenarios = {
+    "decode": (f"{count} separate decoded sprites", decode_each),
+    "atlas": (f"atlas of {count} 48px thumbnails", load_atlas),
+    "cache": ("sprite cache with a 4 MB budget", fill_cache),
+}
+
+def run_scenario(name, directory):
+    label, build = scenarios[name]
+    root = tk_root()
+    gc.collect()
+    before = resident_memory()
+    start = time.perf_counter()
+    kept = build(directory, root)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    grown = resident_memory() - before
+    print(f"{label:<34} {elapsed * 1000:8.1f} ms   +{grown / 1024 / 1024:6.1f} MB resident"
+          + ("" if root else "   (no display, PIL images only)"))
+    if isinstance(kept, sprites.SpriteCache):
+        print(f"{'':<34} holds {len(kept.images)} sprites, {kept.used / 1024 / 1024:.1f} MB estimated")
+
+def main():
+    if len(sys.argv) == 3:
+        run_scenario(sys.argv[1], sys.argv[2])
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        images = {}
+        for index in range(count):
+            images[f"pokemon-{index}"] = make_sprite(index)
+            images[f"pokemon-{index}"].save(os.path.join(directory, f"{index}.png"))
+        sprites.build_atlas(images).save(os.path.join(directory, sprites.atlas_file),
+                                         os.path.join(directory, sprites.atlas_offsets_file))
+        separate = sum(os.path.getsize(os.path.join(directory, f"{index}.png")) for index in range(count))
+        print(f"atlas file {os.path.getsize(os.path.join(directory, sprites.atlas_file)) / 1024:.1f} KB, "
+              f"separate PNGs {separate / 1024:.1f} KB")
+        for name in scenarios:
+            subprocess.run([sys.executable, os.path.abspath(__file__), name, directory], check=True)
+
+if __name__ == "__main__":
+    main()
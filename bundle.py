@@ -0,0 +1,100 @@
+import gzip
+import io
+import lzma
+import os
+import shutil
+import sys
+
+try:
+    import zstandard # type: ignore
+except ImportError:
+    zstandard = None
+
+# CSV files bundled with the app
+csv_files = ["Pokemon.csv", "Pokemon Database.csv"]
+
+def open_zst(path):
+    """Open a zstd compressed file as a binary stream."""
+    return zstandard.ZstdDecompressor().stream_reader(open(path, mode='rb'), closefd=True)
+
+def write_zst(source, path):
+    with open(path, mode='wb') as target:
+        with zstandard.ZstdCompressor(level=19).stream_writer(target) as writer:
+            shutil.copyfileobj(source, writer)
+
+def write_gz(source, path):
+    with gzip.open(path, mode='wb', compresslevel=9) as target:
+        shutil.copyfileobj(source, target)
+
+def write_xz(source, path):
+    with lzma.open(path, mode='wb', preset=9 | lzma.PRESET_EXTREME) as target:
+        shutil.copyfileobj(source, target)
+
+# Compressed variants by suffix, in order of preference, as (open binary stream, write)
+codecs = {
+    ".xz": (lzma.open, write_xz),
+    ".gz": (gzip.open, write_gz),
+}
+if zstandard:
+    codecs = {".zst": (open_zst, write_zst), **codecs}
+
+def compressed_path(csv_file):
+    """Return the first compressed variant of csv_file that exists, or None."""
+    for suffix in codecs:
+        if os.path.exists(csv_file + suffix):
+            return csv_file + suffix
+    return None
+
+def dataset_exists(csv_file):
+    """Check whether csv_file exists, plain or compressed."""
+    return os.path.exists(csv_file) or compressed_path(csv_file) is not None
+
+def open_dataset(csv_file):
+    """Open csv_file for the csv module, decompressing on the fly if only a compressed copy exists.
+
+    The plain CSV file wins when there is one, since that is the copy add_entry and
+    the offset index write to.
+    """
+    if os.path.exists(csv_file):
+        return open(csv_file, mode='r', newline='', encoding='utf-8')
+    path = compressed_path(csv_file)
+    if path is None:
+        raise FileNotFoundError(f"The CSV file {csv_file} does not exist.")
+    stream = codecs[path[len(csv_file):]][0](path)
+    return io.TextIOWrapper(stream, encoding='utf-8', newline='')
+
+def read_bytes(csv_file):
+    """Return the contents of csv_file as bytes, decompressing a compressed copy if needed."""
+    if os.path.exists(csv_file):
+        with open(csv_file, mode='rb') as file:
+            return file.read()
+    path = compressed_path(csv_file)
+    if path is None:
+        raise FileNotFoundError(f"The CSV file {csv_file} does not exist.")
+    with codecs[path[len(csv_file):]][0](path) as stream:
+        return stream.read()
+
+def materialize(csv_file):
+    """Decompress csv_file next to its compressed copy if there is no plain file yet.
+
+    Needed before anything that appends to or seeks in the file.
+    """
+    if os.path.exists(csv_file) or compressed_path(csv_file) is None:
+        return
+    temp_file = csv_file + ".tmp"
+    with open_dataset(csv_file) as source, open(temp_file, mode='w', newline='', encoding='utf-8') as target:
+        shutil.copyfileobj(source, target)
+    os.replace(temp_file, csv_file)
+
+def build(suffix, directory="."):
+    """Write a compressed copy of each bundled CSV file, for packaging instead of the plain files."""
+    write = codecs[suffix][1]
+    for csv_file in csv_files:
+        path = os.path.join(directory, csv_file)
+        with open(path, mode='rb') as source:
+            write(source, path + suffix)
+        print(f"{csv_file}: {os.path.getsize(path)} -> {os.path.getsize(path + suffix)} bytes ({path + suffix})")
+
+if __name__ == "__main__":
+    # Build step, e.g. python bundle.py .xz, then add the .xz files to the PyInstaller bundle
+    build('.' + sys.argv[1].lstrip('.') if len(sys.argv) > 1 else next(iter(codecs)))
@@ -5,8 +5,11 @@ import difflib
 import sys
 import os
 import requests # type: ignore
+import bundle
 import data
+import offsets
 import remove
+import store
 from PIL import Image, ImageTk # type: ignore
 from io import BytesIO
 
@@ -25,7 +28,7 @@ def resource_path(relative_path):
 
 def initialize_csv(csv_file):
     """Initialize the CSV file with headers if it doesn't exist."""
-    if not os.path.exists(csv_file):
+    if not bundle.dataset_exists(csv_file):
         with open(csv_file, mode='w', newline='', encoding='utf-8') as file:
             writer = csv.writer(file)
             if csv_file == "Pokemon.csv":
@@ -117,6 +120,7 @@ def display_form_data(form, name_key):
 
 def add_entry(csv_file):
     """Add a new entry to the selected CSV file."""
+    bundle.materialize(csv_file)
     with open(csv_file, mode='a', newline='', encoding='utf-8') as file:
         writer = csv.writer(file)
 
@@ -140,12 +144,12 @@ def add_entry(csv_file):
 
 def retrieve_entry(csv_file):
     """Retrieve entries with advanced filtering options."""
-    if not os.path.exists(csv_file):
+    if not bundle.dataset_exists(csv_file):
         print(f"The CSV file {csv_file} does not exist.")
         return
 
     while True:
-        with open(csv_file, mode='r', encoding='utf-8') as file:
+        with bundle.open_dataset(csv_file) as file:
             reader = csv.DictReader(file)
             headers = reader.fieldnames
 
@@ -168,6 +172,8 @@ def retrieve_entry(csv_file):
             criteria_options = ["id", "name", "type"]
             if form_key:
                 criteria_options.append("form")
+            if any(column in headers for column in store.text_columns):
+                criteria_options.append("text")
 
             criteria_prompt = ", ".join([option.capitalize() for option in criteria_options])
             criteria = input(f"Search by ({criteria_prompt}, or 'b' to go back): ").strip().lower()
@@ -181,30 +187,20 @@ def retrieve_entry(csv_file):
             if value == 'b':
                 continue  # Go back to the retrieval menu
 
-            # Reset the reader to the beginning of the file
-            file.seek(0)
-            reader = csv.DictReader(file)
-
-            matching_forms = []
-            names_list = []
-
-            for row in reader:
-                names_list.append(row[name_key])
-                matches = False
-
-                if criteria == "id" and row[id_key].strip().lower() == value:
-                    matches = True
-                elif criteria == "name" and row[name_key].strip().lower() == value:
-                    matches = True
-                elif criteria == "type" and (
-                    value == row[type_key1].strip().lower() or value == row.get(type_key2, '').strip().lower()
-                ):
-                    matches = True
-                elif criteria == "form" and form_key and row[form_key].strip().lower() == value:
-                    matches = True
-
-                if matches:
-                    matching_forms.append(row)
+            search_columns = {
+                "id": [id_key],
+                "name": [name_key],
+                "type": [type_key1, type_key2],
+                "form": [form_key],
+            }
+            if criteria == "text":
+                # Ranked full-text search over abilities, classification and evolution details
+                matching_forms = store.get_store(csv_file).search_text(value)
+            elif criteria == "id":
+                # Read straight from the row offsets, with logged edits applied
+                matching_forms = offsets.get_index(csv_file).read(value)
+            else:
+                matching_forms = store.get_store(csv_file).find_rows(search_columns[criteria], value)
 
             if matching_forms:
                 if len(matching_forms) > 1:
@@ -213,21 +209,18 @@ def retrieve_entry(csv_file):
                         continue  # Go back to the retrieval menu
                 else:
                     display_form_data(matching_forms[0], name_key)
+            elif criteria == "text":
+                print(f"No matching entry found for text = {value}.")
             else:
                 # If no exact match, suggest the closest name
+                with bundle.open_dataset(csv_file) as names_file:
+                    names_list = [row[name_key] for row in csv.DictReader(names_file)]
                 closest_name = find_closest_name(value, names_list)
                 if closest_name:
                     confirm = input(f"No exact match found. Did you mean '{closest_name}'? (y/n): ").strip().lower()
                     if confirm == 'y':
                         value = closest_name.lower()
-                        # Reset the reader to the beginning of the file
-                        file.seek(0)
-                        reader = csv.DictReader(file)
-                        matching_forms = []
-
-                        for row in reader:
-                            if row[name_key].strip().lower() == value:
-                                matching_forms.append(row)
+                        matching_forms = store.get_store(csv_file).find_rows([name_key], value)
 
                         if matching_forms:
                             if len(matching_forms) > 1:
@@ -243,6 +236,67 @@ def retrieve_entry(csv_file):
                 else:
                     print(f"No matching entry found for {criteria} = {value}.")
 
+def select_entry(index):
+    """Prompt for an entry by ID, and by form if several share it. Returns (id, occurrence, row)."""
+    row_id = input("Enter the ID of the entry (or 'b' to go back): ").strip()
+    if row_id.lower() == 'b':
+        return None
+    entries = index.entries(row_id)
+    if not entries:
+        print(f"No matching entry found for id = {row_id}.")
+        return None
+    if len(entries) == 1:
+        return (row_id,) + entries[0]
+
+    print("\nMultiple forms found:")
+    for number, (occurrence, row) in enumerate(entries, start=1):
+        print(f"{number}. {index.describe(row)}")
+    while True:
+        selected = input("Enter the number of the form (or 'b' to go back): ").strip().lower()
+        if selected == 'b':
+            return None
+        if selected.isdigit() and 1 <= int(selected) <= len(entries):
+            return (row_id,) + entries[int(selected) - 1]
+        print("Invalid selection. Please try again.")
+
+def edit_entry(csv_file):
+    """Edit an existing entry of the selected CSV file."""
+    index = offsets.get_index(csv_file)
+    selected = select_entry(index)
+    if selected is None:
+        return
+    row_id, occurrence, row = selected
+
+    print("Enter the new details (press Enter to keep the current value, 'b' to go back):")
+    for header in index.headers:
+        # Rows are addressed by id, so it can't be changed here
+        if header in offsets.id_columns:
+            continue
+        value = input(f"{header} [{row.get(header) or ''}]: ").strip()
+        if value.lower() == 'b':
+            return  # Go back to the main menu
+        if value:
+            row[header] = value
+
+    # The change goes to the update log, compaction writes it into the CSV file
+    index.update(row_id, occurrence, row)
+    index.start_compaction()
+    print("Entry updated successfully!")
+
+def delete_entry(csv_file):
+    """Delete an existing entry from the selected CSV file."""
+    index = offsets.get_index(csv_file)
+    selected = select_entry(index)
+    if selected is None:
+        return
+    row_id, occurrence, row = selected
+
+    confirm = input(f"Delete {index.describe(row)}? (y/n): ").strip().lower()
+    if confirm == 'y':
+        index.delete(row_id, occurrence)
+        index.start_compaction()
+        print("Entry deleted successfully!")
+
 def select_database():
     """Prompt the user to select between Simple and Complex databases."""
     while True:
@@ -261,13 +315,16 @@ def main():
     """Main function to run the program."""
     csv_file = select_database()
     initialize_csv(csv_file)
+    offsets.get_index(csv_file).resume_compaction()
 
     while True:
         print("\nOptions:")
         print("1. Add a new Pokémon entry")
         print("2. Retrieve an entry")
-        print("3. Change Database")
-        print("4. Exit")
+        print("3. Edit an entry")
+        print("4. Delete an entry")
+        print("5. Change Database")
+        print("6. Exit")
 
         choice = input("Enter your choice: ").strip()
         if choice == "1":
@@ -275,10 +332,15 @@ def main():
         elif choice == "2":
             retrieve_entry(csv_file)
         elif choice == "3":
+            edit_entry(csv_file)
+        elif choice == "4":
+            delete_entry(csv_file)
+        elif choice == "5":
             # Re-select the database
             csv_file = select_database()
             initialize_csv(csv_file)
-        elif choice == "4":
+            offsets.get_index(csv_file).resume_compaction()
+        elif choice == "6":
             print("Exiting the program.")
             break
         else:
@@ -317,8 +379,10 @@ class PokemonGUI:
             messagebox.showerror("Invalid Choice", "Please enter 1 or 2.")
             return
 
-        # Initialize the CSV file
+        # Initialize the CSV file and start following changes made by other sessions
         initialize_csv(self.csv_file)
+        store.get_store(self.csv_file).start_watcher()
+        offsets.get_index(self.csv_file).resume_compaction()
         messagebox.showinfo("Database Selected", f"Database set to {self.csv_file}")
 
     def add_entry(self):
@@ -326,6 +390,7 @@ class PokemonGUI:
             messagebox.showwarning("No Database Selected", "Please select a database first.")
             return
 
+        bundle.materialize(self.csv_file)
         with open(self.csv_file, mode='a', newline='', encoding='utf-8') as file:
             writer = csv.writer(file)
 
@@ -350,7 +415,7 @@ class PokemonGUI:
             return
 
         # Open the CSV file
-        with open(self.csv_file, mode='r', encoding='utf-8') as file:
+        with bundle.open_dataset(self.csv_file) as file:
             reader = csv.DictReader(file)
             headers = reader.fieldnames
 
@@ -372,59 +437,48 @@ class PokemonGUI:
             criteria_options = ["id", "name", "type"]
             if form_key:
                 criteria_options.append("form")
+            if any(column in headers for column in store.text_columns):
+                criteria_options.append("text")
 
             criteria = simpledialog.askstring("Search Entry", f"Search by ({', '.join(criteria_options)}):")
             if criteria is None or criteria.lower() not in criteria_options:
                 messagebox.showerror("Invalid Input", "Invalid search criteria.")
                 return
+            criteria = criteria.lower()
 
             value = simpledialog.askstring("Search Entry", f"Enter the {criteria}:")
             if value is None:
                 return
 
             value = value.strip().lower()
-            file.seek(0)
-            reader = csv.DictReader(file)
-
-            matching_forms = []
-            names_list = []
-
-            for row in reader:
-                names_list.append(row[name_key])
-                matches = False
-
-                if criteria == "id" and row[id_key].strip().lower() == value:
-                    matches = True
-                elif criteria == "name" and row[name_key].strip().lower() == value:
-                    matches = True
-                elif criteria == "type" and (
-                    value == row[type_key1].strip().lower() or value == row.get(type_key2, '').strip().lower()
-                ):
-                    matches = True
-                elif criteria == "form" and form_key and row[form_key].strip().lower() == value:
-                    matches = True
-
-                if matches:
-                    matching_forms.append(row)
+            search_columns = {
+                "id": [id_key],
+                "name": [name_key],
+                "type": [type_key1, type_key2],
+                "form": [form_key],
+            }
+            if criteria == "text":
+                # Ranked full-text search over abilities, classification and evolution details
+                matching_forms = store.get_store(self.csv_file).search_text(value)
+            else:
+                matching_forms = store.get_store(self.csv_file).find_rows(search_columns[criteria], value)
 
             if matching_forms:
                 if len(matching_forms) > 1:
                     self.prompt_form_selection(matching_forms, name_key, form_key)
                 else:
                     self.display_form_data(matching_forms[0], name_key)
+            elif criteria == "text":
+                messagebox.showinfo("Not Found", f"No matching entry found for text = {value}.")
             else:
+                with bundle.open_dataset(self.csv_file) as names_file:
+                    names_list = [row[name_key] for row in csv.DictReader(names_file)]
                 closest_name = find_closest_name(value, names_list)
                 if closest_name:
                     confirm = messagebox.askyesno("No Exact Match", f"Did you mean '{closest_name}'?")
                     if confirm:
                         value = closest_name.lower()
-                        file.seek(0)
-                        reader = csv.DictReader(file)
-                        matching_forms = []
-
-                        for row in reader:
-                            if row[name_key].strip().lower() == value:
-                                matching_forms.append(row)
+                        matching_forms = store.get_store(self.csv_file).find_rows([name_key], value)
 
                         if matching_forms:
                             if len(matching_forms) > 1:
@@ -0,0 +1,133 @@
+import bisect
+import math
+import re
+from array import array
+
+# Position gap between fields so phrases don't match across two columns
+field_gap = 1000
+
+# BM25 parameters
+k1 = 1.2
+b = 0.75
+
+def tokenize(text):
+    """Split text into lowercase word tokens."""
+    return re.findall(r"\w+", text.lower())
+
+class Postings:
+    """Documents containing a term, with the term's frequency and positions in each."""
+
+    def __init__(self):
+        self.docs = array('I')
+        self.freqs = array('I')
+        self.starts = array('I')
+        self.positions = array('I')
+
+    def positions_in(self, doc_id):
+        """Return the positions of the term in doc_id, or an empty slice."""
+        k = bisect.bisect_left(self.docs, doc_id)
+        if k == len(self.docs) or self.docs[k] != doc_id:
+            return self.positions[0:0]
+        return self.positions[self.starts[k]:self.starts[k] + self.freqs[k]]
+
+class FullTextIndex:
+    """Inverted index over the text fields of the rows, ranked with BM25.
+
+    Documents are numbered in the order they are added, so posting lists stay sorted
+    and appended rows can be merged without rebuilding. Queries are bare words (any
+    may match), "quoted phrases" (all must match) and prefixes ending in *.
+    """
+
+    def __init__(self):
+        self.terms = {}
+        self.doc_lengths = array('I')
+        self.total_length = 0
+        self.sorted_terms = None
+
+    def add(self, doc_id, fields):
+        """Index the text fields of document doc_id, which must be the next free id."""
+        if doc_id != len(self.doc_lengths):
+            raise ValueError(f"Documents must be added in order, expected {len(self.doc_lengths)}.")
+        positions = {}
+        position = 0
+        for text in fields:
+            for token in tokenize(text):
+                positions.setdefault(token, []).append(position)
+                position += 1
+            position += field_gap
+        for term, term_positions in positions.items():
+            postings = self.terms.get(term)
+            if postings is None:
+                postings = self.terms[term] = Postings()
+                self.sorted_terms = None
+            postings.docs.append(doc_id)
+            postings.freqs.append(len(term_positions))
+            postings.starts.append(len(postings.positions))
+            postings.positions.extend(term_positions)
+        length = sum(len(term_positions) for term_positions in positions.values())
+        self.doc_lengths.append(length)
+        self.total_length += length
+
+    def expand_prefix(self, prefix):
+        """Return every indexed term starting with prefix."""
+        if self.sorted_terms is None:
+            self.sorted_terms = sorted(self.terms)
+        start = bisect.bisect_left(self.sorted_terms, prefix)
+        end = bisect.bisect_left(self.sorted_terms, prefix + '\uffff')
+        return self.sorted_terms[start:end]
+
+    def phrase_docs(self, tokens):
+        """Return the set of documents containing tokens as consecutive words."""
+        postings = [self.terms.get(token) for token in tokens]
+        if not postings or None in postings:
+            return set()
+        candidates = set(postings[0].docs)
+        for term_postings in postings[1:]:
+            candidates.intersection_update(term_postings.docs)
+        matches = set()
+        for doc_id in candidates:
+            following = [set(term_postings.positions_in(doc_id)) for term_postings in postings[1:]]
+            for start in postings[0].positions_in(doc_id):
+                if all(start + offset in term_positions
+                       for offset, term_positions in enumerate(following, start=1)):
+                    matches.add(doc_id)
+                    break
+        return matches
+
+    def search(self, query, limit=20):
+        """Return up to limit (doc_id, score) pairs for query, best first."""
+        terms = []
+        required = None
+        for phrase, word in re.findall(r'"([^"]*)"|(\S+)', query):
+            if phrase:
+                tokens = tokenize(phrase)
+                if tokens:
+                    terms.extend(tokens)
+                    docs = self.phrase_docs(tokens)
+                    required = docs if required is None else required & docs
+            elif word.endswith('*'):
+                # Only the last token of a word like "pokémon's*" is a prefix
+                tokens = tokenize(word[:-1])
+                terms.extend(tokens[:-1])
+                for prefix in tokens[-1:]:
+                    terms.extend(self.expand_prefix(prefix))
+            else:
+                terms.extend(tokenize(word))
+
+        count = len(self.doc_lengths)
+        if not count:
+            return []
+        average_length = self.total_length / count
+        scores = {}
+        for term in set(terms):
+            postings = self.terms.get(term)
+            if postings is None:
+                continue
+            idf = math.log(1 + (count - len(postings.docs) + 0.5) / (len(postings.docs) + 0.5))
+            for doc_id, freq in zip(postings.docs, postings.freqs):
+                if required is not None and doc_id not in required:
+                    continue
+                norm = k1 * (1 - b + b * self.doc_lengths[doc_id] / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * freq * (k1 + 1) / (freq + norm)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
@@ -0,0 +1,284 @@
+import csv
+import io
+import json
+import os
+import threading
+import bundle
+
+# Id column of either database
+id_columns = ["ID", "Pokemon Id"]
+
+# How often a background compaction starts over when the file changes under it
+compaction_attempts = 3
+
+def records(file):
+    """Yield (offset, bytes) for every CSV record of a binary file, joining quoted newlines."""
+    offset = file.tell()
+    record = b''
+    for line in file:
+        record += line
+        # An odd number of quotes means a quoted field continues on the next line
+        if record.count(b'"') % 2 == 0:
+            yield offset, record
+            offset += len(record)
+            record = b''
+    if record:
+        yield offset, record
+
+def parse_record(record):
+    """Return the fields of one CSV record given as bytes."""
+    return next(csv.reader([record.decode('utf-8')]), [])
+
+def row_dict(headers, fields):
+    """Map fields to headers the way csv.DictReader does, with None for missing fields."""
+    row = dict(zip(headers, fields))
+    if len(fields) > len(headers):
+        row[None] = fields[len(headers):]
+    for header in headers[len(fields):]:
+        row[header] = None
+    return row
+
+class OffsetIndex:
+    """Sidecar index from each row's id to its byte offset and length in the CSV file.
+
+    Forms share an id, so a row is addressed by its id and its occurrence among the
+    rows with that id (0 for the first). Edits and deletes are appended to an update
+    log instead of rewriting the file, with a tombstone for each deleted row, and are
+    applied when reading. compact() folds the log back into the CSV file with an
+    atomic os.replace, like remove.remove_all_quotes_once does.
+
+    The log starts with the inode and size of the CSV file it was written against.
+    Appending rows keeps both valid, but a rewrite gives the file a new inode, so a
+    log left behind by a rewrite (or a compaction that crashed before clearing it)
+    is discarded instead of being applied to rows that may have moved.
+
+    The index is saved next to the CSV file and rebuilt whenever the file's inode,
+    size or mtime no longer match the ones it was built from.
+    """
+
+    def __init__(self, csv_file):
+        self.csv_file = csv_file
+        self.index_file = csv_file + ".idx"
+        self.log_file = csv_file + ".log"
+        self.lock = threading.RLock()
+        self.headers = []
+        self.offsets = {}
+        self.stat = None
+        self.compacting = False
+        self.updates = {}
+
+    def file_stat(self):
+        stat = os.stat(self.csv_file)
+        return [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+    def ensure_current(self):
+        """Load the sidecar index, or rebuild it if it is missing or stale."""
+        # Seeking needs the plain file, so decompress a bundled copy first
+        bundle.materialize(self.csv_file)
+        stat = self.file_stat()
+        if stat == self.stat:
+            return
+        try:
+            with open(self.index_file, mode='r', encoding='utf-8') as file:
+                table = json.load(file)
+            if table["stat"] == stat:
+                self.headers = table["headers"]
+                self.offsets = {row_id: [tuple(entry) for entry in entries]
+                                for row_id, entries in table["offsets"].items()}
+                self.stat = stat
+        except (OSError, ValueError, KeyError):
+            pass
+        if self.stat != stat:
+            self.rebuild()
+        # The file changed, so other sessions may have logged or compacted changes too
+        self.updates = self.read_log()
+        if self.updates:
+            self.start_compaction()
+
+    def rebuild(self):
+        """Scan the CSV file for the offset of every row and save the sidecar index."""
+        offsets = {}
+        with open(self.csv_file, mode='rb') as file:
+            stat = os.fstat(file.fileno())
+            rows = records(file)
+            headers = parse_record(next(rows, (0, b''))[1])
+            id_index = next((headers.index(column) for column in id_columns if column in headers), 0)
+            for offset, record in rows:
+                fields = parse_record(record)
+                if len(fields) > id_index:
+                    offsets.setdefault(fields[id_index].strip(), []).append((offset, len(record)))
+
+        self.headers = headers
+        self.offsets = offsets
+        self.stat = [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+        try:
+            with open(self.index_file, mode='w', encoding='utf-8') as file:
+                json.dump({"stat": self.stat, "headers": headers, "offsets": offsets}, file)
+        except OSError as e:
+            # The index still works from memory, e.g. in a read-only bundle
+            print(f"Could not save {self.index_file}: {e}")
+
+    def read_log(self):
+        """Return the logged changes as {(id, occurrence): fields or None for a tombstone}.
+
+        A log written against another version of the CSV file is deleted, see the
+        class docstring. Call after ensure_current, which sets the file's stat.
+        """
+        updates = {}
+        try:
+            with open(self.log_file, mode='r', newline='', encoding='utf-8') as file:
+                entries = csv.reader(file)
+                header = next(entries, [])
+                if (len(header) == 3 and header[0] == "file" and header[1] == str(self.stat[0])
+                        and header[2].isdigit() and int(header[2]) <= self.stat[1]):
+                    for entry in entries:
+                        if len(entry) < 3:
+                            continue
+                        key = (entry[1], int(entry[2]))
+                        updates[key] = entry[3:] if entry[0] == "update" else None
+                    return updates
+        except FileNotFoundError:
+            return updates
+        if header:
+            print(f"Discarding {self.log_file}, it was written for an earlier version of {self.csv_file}.")
+        os.remove(self.log_file)
+        return updates
+
+    def append_log(self, entry):
+        with open(self.log_file, mode='a', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            if file.tell() == 0:
+                writer.writerow(["file", self.stat[0], self.stat[1]])
+            writer.writerow(entry)
+
+    def entries(self, row_id):
+        """Return (occurrence, row) for every row with row_id, reading each with one seek."""
+        row_id = row_id.strip()
+        with self.lock:
+            self.ensure_current()
+            found = []
+            with open(self.csv_file, mode='rb') as file:
+                for occurrence, (offset, length) in enumerate(self.offsets.get(row_id, [])):
+                    key = (row_id, occurrence)
+                    if key in self.updates:
+                        fields = self.updates[key]
+                        if fields is None:
+                            continue
+                    else:
+                        file.seek(offset)
+                        fields = parse_record(file.read(length))
+                    found.append((occurrence, row_dict(self.headers, fields)))
+            return found
+
+    def read(self, row_id):
+        """Return every live row with row_id."""
+        return [row for occurrence, row in self.entries(row_id)]
+
+    def describe(self, row):
+        """Return "Name - Form" for a row, to tell forms with the same id apart."""
+        name_key = "Name" if "Name" in self.headers else "Pokemon Name"
+        form_key = "Form" if "Form" in self.headers else "Alternate Form Name"
+        return f"{row.get(name_key)} - {(row.get(form_key) or '').strip() or 'Standard'}"
+
+    def update(self, row_id, occurrence, row):
+        """Replace the row at (row_id, occurrence) with row, through the update log.
+
+        The row keeps its id, since the log addresses rows by id.
+        """
+        with self.lock:
+            self.ensure_current()
+            fields = [row.get(header) or '' for header in self.headers]
+            if self.id_index() < len(fields):
+                fields[self.id_index()] = row_id.strip()
+            self.append_log(["update", row_id.strip(), occurrence] + fields)
+            self.updates[(row_id.strip(), occurrence)] = fields
+
+    def delete(self, row_id, occurrence):
+        """Delete the row at (row_id, occurrence) by logging a tombstone for it."""
+        with self.lock:
+            self.ensure_current()
+            self.append_log(["delete", row_id.strip(), occurrence])
+            self.updates[(row_id.strip(), occurrence)] = None
+
+    def id_index(self):
+        """Return the position of the id column in the headers."""
+        return next((self.headers.index(column) for column in id_columns if column in self.headers), 0)
+
+    def compact(self):
+        """Rewrite the CSV file with the logged changes applied, then clear the log.
+
+        Returns False if the file changed while it was being copied, in which case
+        the log is kept and nothing is replaced.
+        """
+        with self.lock:
+            self.ensure_current()
+            # Pick up changes other sessions logged since the file last changed
+            self.updates = self.read_log()
+            if not self.updates:
+                return True
+            stat = self.stat
+            temp_file = self.csv_file + ".tmp"
+            seen = {}
+            with open(self.csv_file, mode='rb') as file, open(temp_file, mode='wb') as temp:
+                rows = records(file)
+                header = next(rows, (0, b''))[1]
+                temp.write(header)
+                id_index = self.id_index()
+                for offset, record in rows:
+                    fields = parse_record(record)
+                    row_id = fields[id_index].strip() if len(fields) > id_index else ''
+                    key = (row_id, seen.get(row_id, 0))
+                    seen[row_id] = key[1] + 1
+                    if key not in self.updates:
+                        # Untouched rows are copied byte for byte
+                        temp.write(record)
+                    elif self.updates[key] is not None:
+                        buffer = io.StringIO()
+                        csv.writer(buffer).writerow(self.updates[key])
+                        temp.write(buffer.getvalue().encode('utf-8'))
+
+            # Another session may have added a row while the file was copied. Keep the
+            # log and try again rather than lose the row.
+            if self.file_stat() != stat:
+                os.remove(temp_file)
+                print(f"{self.csv_file} changed during compaction, keeping {self.log_file} for later.")
+                return False
+
+            # Replace the original CSV file with the compacted version. If this process
+            # dies before the log is removed, the new inode makes read_log discard it.
+            os.replace(temp_file, self.csv_file)
+            os.remove(self.log_file)
+            self.updates = {}
+            self.rebuild()
+            return True
+
+    def start_compaction(self):
+        """Run compact() in a background thread unless one is already running."""
+        with self.lock:
+            if self.compacting:
+                return
+            self.compacting = True
+
+        def run():
+            try:
+                for attempt in range(compaction_attempts):
+                    if self.compact():
+                        break
+            finally:
+                self.compacting = False
+        threading.Thread(target=run, daemon=True).start()
+
+    def resume_compaction(self):
+        """Start a compaction if an earlier session left changes in the update log."""
+        if os.path.exists(self.log_file):
+            self.start_compaction()
+
+# One offset index per CSV file, shared by the CLI and the GUI
+indexes = {}
+
+def get_index(csv_file):
+    """Return the offset index for csv_file."""
+    csv_file = os.path.abspath(csv_file)
+    if csv_file not in indexes:
+        indexes[csv_file] = OffsetIndex(csv_file)
+    return indexes[csv_file]
@@ -0,0 +1,72 @@
+import csv
+import mmap
+import os
+import bundle
+
+def scan_rows(csv_file, columns, value):
+    """Return the rows whose value in any of the given columns equals value, parsing every row."""
+    with bundle.open_dataset(csv_file) as file:
+        return [row for row in csv.DictReader(file) if row_matches(row, columns, value)]
+
+def row_matches(row, columns, value):
+    """Check whether any of the given columns of a row equals value (case-insensitive)."""
+    return any((row.get(column) or '').strip().lower() == value for column in columns)
+
+def find_rows(csv_file, columns, value, chunk_size=1 << 20):
+    """Return the rows whose value in any of the given columns equals value.
+
+    The file is memory-mapped (or decompressed into memory, if only a compressed copy
+    exists) and searched for the raw bytes of value, so only the lines that contain
+    it somewhere get parsed with csv and checked against the columns. Values the byte
+    search can't handle reliably (empty, non-ASCII or containing quotes) go through
+    scan_rows instead, since bytes.lower() only folds ASCII letters.
+    """
+    value = value.strip().lower()
+    if not value or not value.isascii() or '"' in value:
+        return scan_rows(csv_file, columns, value)
+
+    if not os.path.exists(csv_file):
+        matching_rows = search_buffer(bundle.read_bytes(csv_file), columns, value, chunk_size)
+    else:
+        with open(csv_file, mode='rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return []
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                matching_rows = search_buffer(mm, columns, value, chunk_size)
+    if matching_rows is None:
+        # A quoted field spans several lines, so lines aren't rows here
+        return scan_rows(csv_file, columns, value)
+    return matching_rows
+
+def search_buffer(buffer, columns, value, chunk_size):
+    """Run the byte prefilter of find_rows over the contents of a CSV file.
+
+    Returns None if the file has records spanning several lines.
+    """
+    header_end = buffer.find(b'\n') + 1
+    if header_end == 0:
+        return []
+    headers = next(csv.reader([buffer[:header_end].decode('utf-8')]))
+
+    # Search lowercased, line-aligned chunks so the match is a plain bytes.find
+    needle = value.encode('ascii')
+    matching_rows = []
+    chunk_start = header_end
+    while chunk_start < len(buffer):
+        chunk_end = buffer.find(b'\n', chunk_start + chunk_size) + 1 or len(buffer)
+        chunk = buffer[chunk_start:chunk_end]
+        lowered = chunk.lower()
+        pos = lowered.find(needle)
+        while pos != -1:
+            line_start = chunk.rfind(b'\n', 0, pos) + 1
+            line_end = chunk.find(b'\n', pos + len(needle)) + 1 or len(chunk)
+            pos = lowered.find(needle, line_end)
+
+            line = chunk[line_start:line_end]
+            if line.count(b'"') % 2:
+                return None
+            for row in csv.DictReader([line.decode('utf-8')], fieldnames=headers):
+                if row_matches(row, columns, value):
+                    matching_rows.append(row)
+        chunk_start = chunk_end
+    return matching_rows
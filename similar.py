@@ -0,0 +1,131 @@
+import heapq
+import math
+from array import array
+
+# The six base stats of each database, in the same order
+stat_columns = [
+    ["HP", "Attack", "Defense", "Sp. Atk", "Sp. Def", "Speed"],
+    ["Health Stat", "Attack Stat", "Defense Stat", "Special Attack Stat",
+     "Special Defense Stat", "Speed Stat"],
+]
+dimensions = 6
+
+# Rows per KD-tree leaf, compared directly against the query
+leaf_size = 16
+
+class StatMatrix:
+    """Base stats of every row packed into one contiguous float array, with a KD-tree.
+
+    Row i of the matrix is values[6 * i:6 * i + 6] and belongs to the store row
+    positions[i]. Rows with missing or non-numeric stats are left out. The tree is
+    rebuilt lazily on the first query after rows are added.
+    """
+
+    def __init__(self, headers):
+        self.columns = next((columns for columns in stat_columns
+                             if all(column in headers for column in columns)), None)
+        self.values = array('d')
+        self.positions = array('I')
+        self.index_of = {}
+        self.tree = None
+
+    def vector(self, row):
+        """Return the base stats of a row as a tuple of floats, or None."""
+        if self.columns is None:
+            return None
+        try:
+            return tuple(float(row[column]) for column in self.columns)
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def add(self, position, row):
+        """Add the stats of the row at position, if it has any."""
+        vector = self.vector(row)
+        if vector is None:
+            return
+        self.index_of[position] = len(self.positions)
+        self.positions.append(position)
+        self.values.extend(vector)
+        self.tree = None
+
+    def build_tree(self):
+        """Build the KD-tree as parallel arrays of nodes over a reordering of the matrix rows.
+
+        Leaves hold up to leaf_size rows, order[starts[node]:ends[node]], which are
+        compared directly; inner nodes split on the dimension with the largest spread.
+        """
+        values = self.values
+        order = array('I', range(len(self.positions)))
+        split_dims, split_values = array('B'), array('d')
+        left, right, starts, ends = array('i'), array('i'), array('I'), array('I')
+
+        def build(lo, hi):
+            node = len(split_dims)
+            split_dims.append(0)
+            split_values.append(0.0)
+            left.append(-1)
+            right.append(-1)
+            starts.append(lo)
+            ends.append(hi)
+            if hi - lo <= leaf_size:
+                return node
+            indices = order[lo:hi]
+            dim = max(range(dimensions), key=lambda d: (
+                max(values[i * dimensions + d] for i in indices)
+                - min(values[i * dimensions + d] for i in indices)))
+            order[lo:hi] = array('I', sorted(indices, key=lambda i: values[i * dimensions + dim]))
+            mid = (lo + hi) // 2
+            split_dims[node] = dim
+            split_values[node] = values[order[mid] * dimensions + dim]
+            left[node] = build(lo, mid)
+            right[node] = build(mid, hi)
+            return node
+
+        build(0, len(order))
+        self.tree = (order, split_dims, split_values, left, right, starts, ends)
+
+    def nearest(self, vector, k=10, exclude=(), candidates=None):
+        """Return up to k (distance, position) pairs closest to vector, nearest first.
+
+        Rows at the positions in exclude are skipped. If candidates is given, only those
+        positions are considered and they are compared directly instead of through the tree.
+        """
+        values = self.values
+        exclude = set(exclude)
+        if candidates is not None:
+            found = []
+            for position in candidates:
+                i = self.index_of.get(position)
+                if i is not None and position not in exclude:
+                    found.append((math.dist(vector, values[i * dimensions:(i + 1) * dimensions]), position))
+            return heapq.nsmallest(k, found)
+
+        if self.tree is None:
+            self.build_tree()
+        order, split_dims, split_values, left, right, starts, ends = self.tree
+        positions = self.positions
+        heap = []  # Max-heap of the best k so far, as (-distance, position)
+
+        def search(node):
+            if left[node] == -1:
+                for i in order[starts[node]:ends[node]]:
+                    position = positions[i]
+                    if position in exclude:
+                        continue
+                    distance = math.dist(vector, values[i * dimensions:(i + 1) * dimensions])
+                    if len(heap) < k:
+                        heapq.heappush(heap, (-distance, position))
+                    elif distance < -heap[0][0]:
+                        heapq.heapreplace(heap, (-distance, position))
+                return
+            # Rows left of the split are <= split_value, rows right of it are >= it
+            diff = vector[split_dims[node]] - split_values[node]
+            near, far = (left[node], right[node]) if diff < 0 else (right[node], left[node])
+            search(near)
+            # Only cross the split if the ball of the current k-th distance reaches it
+            if len(heap) < k or abs(diff) < -heap[0][0]:
+                search(far)
+
+        if k > 0 and len(positions):
+            search(0)
+        return sorted((-negative, position) for negative, position in heap)
@@ -0,0 +1,130 @@
+import csv
+import json
+import os
+import sys
+from collections import OrderedDict
+from io import BytesIO
+import requests # type: ignore
+from PIL import Image # type: ignore
+
+# Files of the pre-rendered thumbnail atlas, built with: python sprites.py
+atlas_file = "sprite_atlas.png"
+atlas_offsets_file = "sprite_atlas.json"
+
+def api_name(pokemon_name):
+    """Convert a Pokémon name to the name PokéAPI uses in its URLs."""
+    return pokemon_name.lower().replace(' ', '-').replace('.', '').replace("'", '').replace(":", '')
+
+class SpriteCache:
+    """LRU cache of decoded sprites that stays under a memory budget.
+
+    The cost of an image is estimated as 4 bytes per pixel, which is what Tk keeps
+    for a decoded photo image. Evicted images stay alive as long as a widget still
+    references them.
+    """
+
+    def __init__(self, budget=16 * 1024 * 1024):
+        self.budget = budget
+        self.used = 0
+        self.images = OrderedDict()
+
+    def get(self, key):
+        """Return the cached image for key and mark it as recently used, or None."""
+        entry = self.images.get(key)
+        if entry is None:
+            return None
+        self.images.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, image):
+        """Cache image under key, evicting the least recently used images to fit the budget."""
+        if key in self.images:
+            self.used -= self.images.pop(key)[1]
+        cost = image.width() * image.height() * 4
+        self.images[key] = (image, cost)
+        self.used += cost
+        while self.used > self.budget and len(self.images) > 1:
+            _, (_, evicted_cost) = self.images.popitem(last=False)
+            self.used -= evicted_cost
+
+class SpriteAtlas:
+    """Thumbnails of many sprites packed into one image, with a table of their offsets."""
+
+    def __init__(self, image, offsets, thumb_size):
+        self.image = image
+        self.offsets = offsets
+        self.thumb_size = thumb_size
+
+    def offset(self, pokemon_name):
+        """Return the (x, y) of a Pokémon's thumbnail in the atlas, or None."""
+        return self.offsets.get(api_name(pokemon_name))
+
+    def crop(self, pokemon_name):
+        """Return the thumbnail of a Pokémon as a separate image, or None."""
+        offset = self.offset(pokemon_name)
+        if offset is None:
+            return None
+        x, y = offset
+        return self.image.crop((x, y, x + self.thumb_size, y + self.thumb_size))
+
+    def save(self, image_path, offsets_path):
+        """Write the atlas image and its offset table."""
+        self.image.save(image_path, optimize=True)
+        with open(offsets_path, mode='w', encoding='utf-8') as file:
+            json.dump({"thumb_size": self.thumb_size, "offsets": self.offsets}, file)
+
+    @classmethod
+    def load(cls, image_path, offsets_path):
+        """Read an atlas written by save, or return None if it doesn't exist."""
+        if not (os.path.exists(image_path) and os.path.exists(offsets_path)):
+            return None
+        with open(offsets_path, mode='r', encoding='utf-8') as file:
+            table = json.load(file)
+        image = Image.open(image_path)
+        image.load()
+        offsets = {name: tuple(offset) for name, offset in table["offsets"].items()}
+        return cls(image, offsets, table["thumb_size"])
+
+def build_atlas(sprites, thumb_size=48, columns=32):
+    """Pack a dict of name -> sprite image into a SpriteAtlas of square thumbnails."""
+    rows = max(1, -(-len(sprites) // columns))
+    atlas = Image.new("RGBA", (columns * thumb_size, rows * thumb_size))
+    offsets = {}
+    for index, (name, sprite) in enumerate(sprites.items()):
+        thumb = sprite.convert("RGBA")
+        thumb.thumbnail((thumb_size, thumb_size))
+        x = (index % columns) * thumb_size
+        y = (index // columns) * thumb_size
+        # Center thumbnails that aren't square
+        atlas.paste(thumb, (x + (thumb_size - thumb.width) // 2, y + (thumb_size - thumb.height) // 2))
+        offsets[api_name(name)] = (x, y)
+    return SpriteAtlas(atlas, offsets, thumb_size)
+
+def fetch_sprite_image(pokemon_name):
+    """Download and decode the front sprite of a Pokémon, or return None."""
+    response = requests.get(f"https://pokeapi.co/api/v2/pokemon/{api_name(pokemon_name)}")
+    if response.status_code != 200:
+        return None
+    sprite_url = response.json()["sprites"]["front_default"]
+    if not sprite_url:
+        return None
+    return Image.open(BytesIO(requests.get(sprite_url).content))
+
+def main():
+    """Build the thumbnail atlas for every Pokémon name in the simple database."""
+    csv_file = sys.argv[1] if len(sys.argv) > 1 else "Pokemon.csv"
+    with open(csv_file, mode='r', encoding='utf-8') as file:
+        names = list(dict.fromkeys(row["Name"] for row in csv.DictReader(file)))
+
+    sprites = {}
+    for name in names:
+        sprite = fetch_sprite_image(name)
+        if sprite is None:
+            print(f"No sprite found for {name}.")
+        else:
+            sprites[name] = sprite
+    build_atlas(sprites).save(atlas_file, atlas_offsets_file)
+    print(f"Packed {len(sprites)} sprites into {atlas_file}.")
+
+if __name__ == "__main__":
+    main()
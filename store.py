@@ -0,0 +1,264 @@
+import csv
+import io
+import os
+import threading
+import bundle
+import fulltext
+import offsets
+import scan
+import similar
+
+# Columns of either database that get an exact-match index
+indexed_columns = ["ID", "Name", "Form", "Type1", "Type2",
+                   "Pokemon Id", "Pokemon Name", "Alternate Form Name",
+                   "Primary Type", "Secondary Type"]
+
+# Type columns of either database, used to filter similar Pokémon
+type_columns = ["Type1", "Type2", "Primary Type", "Secondary Type"]
+
+# Columns of the complex database that are searchable as full text
+text_columns = ["Classification", "Primary Ability", "Primary Ability Description",
+                "Secondary Ability", "Secondary Ability Description",
+                "Hidden Ability", "Hidden Ability Description",
+                "Special Event Ability", "Special Event Ability Description",
+                "Evolution Details"]
+
+# How many bytes before the load offset are compared to detect a rewritten file
+fingerprint_size = 64
+
+class Snapshot:
+    """The rows of a CSV file up to a byte offset, with the indexes built over them."""
+
+    def __init__(self, headers, stat, offset, fingerprint):
+        self.headers = headers
+        self.rows = []
+        self.indexes = {column: {} for column in indexed_columns if column in headers}
+        self.text_columns = [column for column in text_columns if column in headers]
+        self.text_index = fulltext.FullTextIndex()
+        self.stats = similar.StatMatrix(headers)
+        self.inode = stat.st_ino
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime_ns
+        self.offset = offset
+        self.fingerprint = fingerprint
+
+    def add_rows(self, rows):
+        """Append rows and add them to every index."""
+        for row in rows:
+            position = len(self.rows)
+            self.rows.append(row)
+            for column, index in self.indexes.items():
+                key = (row.get(column) or '').strip().lower()
+                index.setdefault(key, []).append(position)
+            # Positions double as document ids, NULL cells are left out of the text
+            fields = [row.get(column) or '' for column in self.text_columns]
+            self.text_index.add(position, [field for field in fields if field != 'NULL'])
+            self.stats.add(position, row)
+
+class PokemonStore:
+    """In-memory copy of a Pokémon CSV file that follows rows appended by other sessions.
+
+    The file is loaded in a background thread. Afterwards each query (or the optional
+    watcher thread) checks the file's inode, size and mtime, and parses only the
+    bytes appended since the last load. If the file was rewritten instead, for example
+    by remove.remove_all_quotes_once, a full reload runs in the background while
+    queries keep using the old snapshot.
+    """
+
+    def __init__(self, csv_file):
+        self.csv_file = csv_file
+        self.snapshot = None
+        self.lock = threading.Lock()
+        self.loading = False
+        self.loaded = threading.Event()
+        self.watcher = None
+        self.stop_watching = threading.Event()
+        self.start_reload()
+
+    def start_reload(self):
+        """Rebuild the snapshot from the whole file in a background thread."""
+        with self.lock:
+            if self.loading:
+                return
+            self.loading = True
+        threading.Thread(target=self.reload, daemon=True).start()
+
+    def reload(self):
+        """Rebuild the snapshot from the whole file and swap it in."""
+        try:
+            if os.path.exists(self.csv_file):
+                with open(self.csv_file, mode='rb') as file:
+                    stat = os.fstat(file.fileno())
+                    content = file.read()
+                # Unlike a tail, the initial load keeps a last line without a newline
+                offset = len(content)
+                reader = csv.DictReader(io.StringIO(content.decode('utf-8'), newline=''))
+                rows = list(reader)
+                snapshot = Snapshot(reader.fieldnames or [], stat, offset,
+                                    content[max(0, offset - fingerprint_size):offset])
+            else:
+                # Only a compressed copy exists, stream it. There is nothing to tail until
+                # a plain file is written, which refresh then sees as a new inode.
+                with bundle.open_dataset(self.csv_file) as file:
+                    reader = csv.DictReader(file)
+                    rows = list(reader)
+                stat = os.stat(bundle.compressed_path(self.csv_file))
+                snapshot = Snapshot(reader.fieldnames or [], stat, 0, b'')
+            snapshot.add_rows(rows)
+            snapshot.stats.build_tree()
+            with self.lock:
+                self.snapshot = snapshot
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            print(f"Could not load {self.csv_file}: {e}")
+        finally:
+            with self.lock:
+                self.loading = False
+            self.loaded.set()
+
+    def refresh(self):
+        """Merge rows appended since the last load, or start a reload if the file was rewritten."""
+        snapshot = self.snapshot
+        if snapshot is None or self.loading:
+            return
+        try:
+            stat = os.stat(self.csv_file)
+        except OSError:
+            return
+        if (stat.st_ino, stat.st_size, stat.st_mtime_ns) == (snapshot.inode, snapshot.size, snapshot.mtime):
+            return
+
+        rewritten = False
+        with self.lock:
+            try:
+                with open(self.csv_file, mode='rb') as file:
+                    stat = os.fstat(file.fileno())
+                    # Another thread may have merged this append while we waited for the lock
+                    if (stat.st_ino, stat.st_size, stat.st_mtime_ns) == (snapshot.inode, snapshot.size, snapshot.mtime):
+                        return
+                    # os.replace gives a new inode, and appending can only make the file longer
+                    if stat.st_ino != snapshot.inode or stat.st_size <= snapshot.size:
+                        rewritten = True
+                    else:
+                        file.seek(snapshot.offset - len(snapshot.fingerprint))
+                        rewritten = file.read(len(snapshot.fingerprint)) != snapshot.fingerprint
+                        appended = file.read()
+                if not rewritten:
+                    # Leave a partially written last line for the next refresh
+                    complete = appended[:appended.rfind(b'\n') + 1]
+                    snapshot.add_rows(self.parse_appended(snapshot, complete))
+                    snapshot.offset += len(complete)
+                    snapshot.fingerprint = (snapshot.fingerprint + complete)[-fingerprint_size:]
+                    snapshot.inode = stat.st_ino
+                    snapshot.size = stat.st_size
+                    snapshot.mtime = stat.st_mtime_ns
+            except OSError:
+                return
+        if rewritten:
+            self.start_reload()
+
+    def parse_appended(self, snapshot, complete):
+        """Return the rows in complete, the bytes appended since the last refresh.
+
+        Records are parsed one at a time, so a record that isn't valid UTF-8 or CSV
+        is reported and skipped instead of holding back the rows after it.
+        """
+        rows = []
+        for offset, record in offsets.records(io.BytesIO(complete)):
+            try:
+                rows.extend(csv.DictReader(io.StringIO(record.decode('utf-8'), newline=''),
+                                           fieldnames=snapshot.headers))
+            except (UnicodeDecodeError, csv.Error) as e:
+                print(f"Skipping a row appended to {self.csv_file}: {e}")
+        return rows
+
+    def find_rows(self, columns, value):
+        """Return the rows whose value in any of the given columns equals value.
+
+        Uses the in-memory indexes when they cover the columns, otherwise (or while the
+        first load is still running) falls back to scan.find_rows on the file.
+        """
+        value = value.strip().lower()
+        self.refresh()
+        snapshot = self.snapshot
+        if snapshot is None or not all(column in snapshot.indexes for column in columns):
+            return scan.find_rows(self.csv_file, columns, value)
+        with self.lock:
+            positions = set()
+            for column in columns:
+                positions.update(snapshot.indexes[column].get(value, []))
+            return [snapshot.rows[position] for position in sorted(positions)]
+
+    def search_text(self, query, limit=20):
+        """Return up to limit rows ranked by how well their text columns match query.
+
+        Waits for the first load, since the text index is only built then.
+        """
+        self.loaded.wait()
+        self.refresh()
+        snapshot = self.snapshot
+        if snapshot is None:
+            return []
+        with self.lock:
+            return [snapshot.rows[doc_id] for doc_id, score in snapshot.text_index.search(query, limit)]
+
+    def find_similar(self, row, k=10, type_name=None, generation=None):
+        """Return up to k rows whose base stats are closest to those of row, nearest first.
+
+        type_name and generation narrow the candidates down first, through the type
+        indexes and the Generation column, which are then compared directly. Only
+        Pokemon.csv has a Generation column, so filtering the complex database by
+        generation raises ValueError. The row itself is left out by its id and form,
+        since it may be a copy read from the offset index or an older snapshot.
+        """
+        self.loaded.wait()
+        self.refresh()
+        snapshot = self.snapshot
+        if snapshot is None:
+            return []
+        if generation and "Generation" not in snapshot.headers:
+            raise ValueError(f"{os.path.basename(self.csv_file)} has no Generation column.")
+        with self.lock:
+            vector = snapshot.stats.vector(row)
+            if vector is None:
+                return []
+            candidates = None
+            if type_name:
+                candidates = set()
+                for column in type_columns:
+                    candidates.update(snapshot.indexes.get(column, {}).get(type_name.strip().lower(), []))
+            if generation:
+                candidates = [position for position in (range(len(snapshot.rows)) if candidates is None else candidates)
+                              if (snapshot.rows[position].get("Generation") or '').strip() == generation]
+            nearest = snapshot.stats.nearest(vector, k, exclude=self.positions_of(snapshot, row),
+                                             candidates=candidates)
+            return [snapshot.rows[position] for distance, position in nearest]
+
+    def positions_of(self, snapshot, row):
+        """Return the positions of the rows in snapshot with the same id and form as row."""
+        id_key = "ID" if "ID" in snapshot.indexes else "Pokemon Id"
+        form_key = "Form" if "Form" in snapshot.headers else "Alternate Form Name"
+        form = (row.get(form_key) or '').strip()
+        return {position for position in snapshot.indexes.get(id_key, {}).get((row.get(id_key) or '').strip().lower(), [])
+                if (snapshot.rows[position].get(form_key) or '').strip() == form}
+
+    def start_watcher(self, interval=1.0):
+        """Refresh the snapshot every interval seconds from a daemon thread."""
+        if self.watcher and self.watcher.is_alive():
+            return
+
+        def watch():
+            while not self.stop_watching.wait(interval):
+                self.refresh()
+        self.stop_watching.clear()
+        self.watcher = threading.Thread(target=watch, daemon=True)
+        self.watcher.start()
+
+# One store per CSV file, shared by the CLI and the GUI
+stores = {}
+
+def get_store(csv_file):
+    """Return the store for csv_file, starting its background load the first time."""
+    csv_file = os.path.abspath(csv_file)
+    if csv_file not in stores:
+        stores[csv_file] = PokemonStore(csv_file)
+    return stores[csv_file]